@@ -1,4 +1,5 @@
 from rest_framework import generics, permissions, renderers
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework.response import Response
 from accounts.models import Profile
 from .serializers import ApiSerializer, UserSerializer
@@ -10,6 +11,11 @@ class ApiList(generics.ListCreateAPIView):
     # permission_classes = (permissions.IsAuthenticatedOrReadOnly)
 
     def perform_create(self, serializer):
+        if not self.request.user.is_authenticated:
+            raise NotAuthenticated()
+        # Profile sudah otomatis dibuat oleh post_save signal,
+        # jadi isi profile milik user tersebut daripada insert baru
+        serializer.instance = Profile.objects.filter(user=self.request.user).first()
         serializer.save(user=self.request.user)
 
 class ApiDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -1,4 +1,5 @@
 from django import forms
+from django.db import transaction
 from django.forms import ModelForm, Textarea, TextInput, inlineformset_factory
 from cashier.models import DaftarBarang, DaftarTransaksi , ListProductTransaksi
 from data.models import Stock
@@ -54,34 +55,43 @@ class TransaksiProductListForm(forms.Form):
 
 
     def save(self,transaksi):
+        if not self.is_valid():
+            "Transaksi Gagal"
+            return False
+
         "get data produk"
         quantity = self.cleaned_data['quantity']
-
-        produk = DaftarBarang.objects.get(nomor =self.cleaned_data['nama_barang'])
-
-        if produk.jumlah_produk >=  int(quantity):
-            produk.jumlah_produk = produk.jumlah_produk - int(quantity)
-            "jika barang == 0"
-            if produk.jumlah_produk == 0:
-                produk.delete()
-            else:
-                produk.subtotal_harga_beli = produk.jumlah_produk * produk.harga_beli_satuan
-                laba_persen = produk.laba_persen * produk.subtotal_harga_beli / 100
-                produk.subtotal_harga_jual = laba_persen + produk.subtotal_harga_beli
-                produk.save()
-        else:
+        if int(quantity) < 1:
             "Transaksi Gagal"
             return False
 
-        "hitung subototal barang"
-        subtotal_produk = produk.harga_jual_satuan * int(quantity)
-        produk_transaksi = ListProductTransaksi.objects.create(
-            transaksi_id = transaksi,
-            nama_barang = produk.nama_product,
-            subtotal = subtotal_produk,
-            quantity = quantity
-        )
-        produk_transaksi.save()
+        with transaction.atomic():
+            "Kunci row produk: dua transaksi simultan tidak boleh sama-sama lolos cek stock"
+            produk = DaftarBarang.objects.select_for_update().get(nomor =self.cleaned_data['nama_barang'])
+
+            if produk.jumlah_produk >=  int(quantity):
+                produk.jumlah_produk = produk.jumlah_produk - int(quantity)
+                "jika barang == 0"
+                if produk.jumlah_produk == 0:
+                    produk.delete()
+                else:
+                    produk.subtotal_harga_beli = produk.jumlah_produk * produk.harga_beli_satuan
+                    laba_persen = produk.laba_persen * produk.subtotal_harga_beli / 100
+                    produk.subtotal_harga_jual = laba_persen + produk.subtotal_harga_beli
+                    produk.save()
+            else:
+                "Transaksi Gagal"
+                return False
+
+            "hitung subototal barang"
+            subtotal_produk = produk.harga_jual_satuan * int(quantity)
+            produk_transaksi = ListProductTransaksi.objects.create(
+                transaksi_id = transaksi,
+                nama_barang = produk.nama_product,
+                subtotal = subtotal_produk,
+                quantity = quantity
+            )
+            produk_transaksi.save()
 
         "Transaksi Sukses"
         return produk_transaksi
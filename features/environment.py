@@ -3,10 +3,41 @@ Behave Environment Configuration
 Setup dan teardown untuk BDD testing
 """
 import os
+import threading
+
 import django
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
+
+def _chrome_options():
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    # driver.get() returns di DOMContentLoaded, tidak menunggu image/font;
+    # steps sudah pakai explicit wait untuk elemen yang benar-benar dibutuhkan
+    chrome_options.page_load_strategy = 'eager'
+    # Test tidak butuh image: block download-nya sama sekali
+    chrome_options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+    })
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    return chrome_options
+
+
+# Spawn Chrome di background thread supaya startup-nya (1-3s) overlap
+# dengan django.setup() di bawah; before_all tinggal join
+_driver_holder = {}
+
+def _spawn_driver():
+    _driver_holder['driver'] = webdriver.Chrome(options=_chrome_options())
+
+_driver_thread = threading.Thread(target=_spawn_driver, daemon=True)
+_driver_thread.start()
+
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
@@ -14,6 +45,31 @@ django.setup()
 BASE_URL = os.getenv('BASE_URL', 'http://localhost:8000')
 WAIT_SECONDS = int(os.getenv('WAIT_SECONDS', '10'))
 
+# In-memory backup dari clean state DB, dibuat sekali di before_all
+_db_snapshot = {}
+
+
+def _snapshot_database():
+    """Simpan clean state SQLite ke in-memory connection via Connection.backup"""
+    import sqlite3
+    from django.db import connection
+    if connection.vendor != 'sqlite':
+        return
+    connection.ensure_connection()
+    snapshot = sqlite3.connect(':memory:')
+    connection.connection.backup(snapshot)
+    _db_snapshot['clean'] = snapshot
+
+
+def _restore_database():
+    """Restore clean state dari snapshot (O(ukuran DB), bukan O(jumlah delete))"""
+    from django.db import connection
+    snapshot = _db_snapshot.get('clean')
+    if snapshot is None:
+        return
+    connection.ensure_connection()
+    snapshot.backup(connection.connection)
+
 
 def before_all(context):
     """
@@ -22,18 +78,25 @@ def before_all(context):
     """
     context.base_url = BASE_URL
     context.wait_seconds = WAIT_SECONDS
-    
-    # Setup Chrome WebDriver
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1920,1080')
-    
-    context.driver = webdriver.Chrome(options=chrome_options)
-    context.driver.implicitly_wait(WAIT_SECONDS)
-    
+
+    # Chrome sudah di-spawn di background sejak import; tinggal join.
+    # No implicitly_wait: a global implicit wait makes every negative
+    # "element absent" lookup block the full timeout; steps use explicit
+    # WebDriverWait conditions where waiting is actually needed
+    _driver_thread.join()
+    if 'driver' not in _driver_holder:
+        raise RuntimeError('Chrome WebDriver failed to start')
+    context.driver = _driver_holder['driver']
+
+    # Start from a known-clean database and snapshot it. Scenario writes
+    # stay in autocommit mode: the runserver process reads the same
+    # cashier.db over its own connection, so data must actually be
+    # committed (and the write lock released) for the server to see it.
+    # Teardown per scenario is a Connection.backup restore - still
+    # O(db size), no per-row DELETEs.
+    _clean_database()
+    _snapshot_database()
+
     print(f"\n🚀 Starting BDD tests against {BASE_URL}")
 
 
@@ -44,21 +107,52 @@ def before_feature(context, feature):
     print(f"\n📝 Testing Feature: {feature.name}")
 
 
-def before_scenario(context, scenario):
+def _clean_database():
     """
-    Executed before each scenario
-    Clean database and setup fresh state
+    Wipe scenario data with raw SQL instead of ORM cascade deletes.
+    ORM delete fetches every row to run cascades and signals (O(N) round-trips);
+    TRUNCATE/raw DELETE is 2 statements regardless of table size.
     """
-    # Clean up database before each scenario
     from django.contrib.auth.models import User
+    from django.db import connection, transaction
     from cashier.models import DaftarBarang, DaftarTransaksi, ListProductTransaksi
-    
-    # Don't delete superuser, but clean other data
-    DaftarBarang.objects.all().delete()
-    ListProductTransaksi.objects.all().delete()
-    DaftarTransaksi.objects.all().delete()
-    User.objects.filter(is_superuser=False).delete()
-    
+
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "TRUNCATE cashier_listproducttransaksi, cashier_daftartransaksi, "
+                "cashier_daftarbarang RESTART IDENTITY CASCADE"
+            )
+            # Don't delete superuser, but clean other users (profiles first: FK)
+            cursor.execute(
+                "DELETE FROM accounts_profile WHERE user_id IN "
+                "(SELECT id FROM auth_user WHERE is_superuser = false)"
+            )
+            cursor.execute("DELETE FROM auth_user WHERE is_superuser = false")
+    else:
+        # SQLite fallback: one transaction (one fsync) and _raw_delete to skip
+        # the Collector walk and pre/post_delete signals. Children before
+        # parents so the raw DELETEs never violate FK constraints.
+        from accounts.models import Profile
+        with transaction.atomic():
+            for queryset in (
+                ListProductTransaksi.objects.all(),
+                DaftarTransaksi.objects.all(),
+                DaftarBarang.objects.all(),
+                Profile.objects.filter(user__is_superuser=False),
+                User.objects.filter(is_superuser=False),
+            ):
+                queryset._raw_delete(queryset.db)
+
+
+def before_scenario(context, scenario):
+    """
+    Executed before each scenario
+    """
+    # Memoized DaftarBarang lookups, keyed by nama_product (see kasir_steps)
+    context._product_cache = {}
+    context._owned_names_cache = None
+
     # Handle continue_after_failed_step tag
     if "continue_after_failed_step" in scenario.effective_tags:
         scenario.continue_after_failed_step = True
@@ -69,7 +163,13 @@ def before_scenario(context, scenario):
 def after_scenario(context, scenario):
     """
     Executed after each scenario
+    Restore the pristine snapshot - the DB forgets all scenario writes
+    (including server-side ones like sessions and cart transactions)
+    without a single DELETE; the committed superuser is part of the
+    snapshot so it survives automatically
     """
+    _restore_database()
+
     if scenario.status == 'failed':
         print(f"  ❌ FAILED: {scenario.name}")
         # Take screenshot on failure
@@ -101,7 +201,7 @@ def after_all(context):
     """
     if hasattr(context, 'driver'):
         context.driver.quit()
-    
+
     print("\n🎉 All BDD tests completed!")
 
 
@@ -8,13 +8,63 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.select import Select
 from decimal import Decimal
-import time
 
 from django.contrib.auth.models import User
 from cashier.models import DaftarBarang, DaftarTransaksi
 from tests.factories import UserFactory, ProfileFactory, DaftarBarangFactory
 
 
+def wait_for(context, condition, timeout=10):
+    """Explicit wait: returns begitu condition terpenuhi (pengganti time.sleep)"""
+    return WebDriverWait(context.driver, timeout).until(condition)
+
+
+def _get_product(context, name, refresh=False):
+    """Memoized DaftarBarang lookup per scenario (cache diisi di before_scenario)"""
+    product = context._product_cache.get(name)
+    if product is None:
+        product = DaftarBarang.objects.get(user=context.profile, nama_product=name)
+        context._product_cache[name] = product
+    elif refresh:
+        # Reload by pk (cheap) daripada get() by name lagi
+        product.refresh_from_db()
+    return product
+
+
+_FILL_FIELDS_JS = (
+    "const data = arguments[0];"
+    "for (const [id, value] of Object.entries(data)) {"
+    "    const el = document.getElementById(id);"
+    "    el.value = value;"
+    "    el.dispatchEvent(new Event('input', {bubbles: true}));"
+    "    el.dispatchEvent(new Event('change', {bubbles: true}));"
+    "}"
+)
+
+
+def _fill_fields(context, field_map):
+    """Set semua input form dalam satu round-trip JS daripada send_keys per field"""
+    context.driver.execute_script(_FILL_FIELDS_JS, field_map)
+
+
+def _owned_names(context):
+    """Set nama produk milik user, di-query sekali per scenario (lazy)"""
+    names = getattr(context, '_owned_names_cache', None)
+    if names is None:
+        names = set(
+            DaftarBarang.objects.filter(user=context.profile)
+            .values_list('nama_product', flat=True)
+        )
+        context._owned_names_cache = names
+    return names
+
+
+def _page_text(context):
+    """Snapshot teks visible body sekali - jauh lebih kecil daripada
+    serialisasi full DOM lewat driver.page_source"""
+    return context.driver.find_element(By.TAG_NAME, 'body').text
+
+
 # ============================================================
 # Authentication Steps
 # ============================================================
@@ -22,62 +72,94 @@ from tests.factories import UserFactory, ProfileFactory, DaftarBarangFactory
 @given('I am logged in as "{username}" with password "{password}"')
 def step_impl(context, username, password):
     """Login sebagai user tertentu"""
+    from django.conf import settings
+    from django.test import Client
+
     # Create user if not exists
     try:
         user = User.objects.get(username=username)
     except User.DoesNotExist:
         user = UserFactory(username=username, password=password)
-        context.user = user
-        context.profile = user.profile
-    
-    # Login via Selenium
-    context.driver.get(f'{context.base_url}/login/')
-    
-    username_field = context.driver.find_element(By.NAME, 'username')
-    password_field = context.driver.find_element(By.NAME, 'password')
-    
-    username_field.send_keys(username)
-    password_field.send_keys(password)
-    
-    submit_button = context.driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]')
-    submit_button.click()
-    
-    time.sleep(1)  # Wait for redirect
+    context.user = user
+    context.profile = user.profile
+
+    if 'ui_login' in context.scenario.effective_tags:
+        # Jalur UI asli - hanya untuk scenario yang menguji form login
+        context.driver.get(f'{context.base_url}/login/')
+
+        context.driver.find_element(By.NAME, 'username').send_keys(username)
+        context.driver.find_element(By.NAME, 'password').send_keys(password)
+        context.driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]').click()
+
+        wait_for(context, EC.url_changes(f'{context.base_url}/login/'))  # Wait for redirect
+        return
+
+    # Fast path: buat session di DB dan inject cookie-nya, skip seluruh
+    # round-trip form login (~3s -> ~50ms). Prasyarat: koneksi behave
+    # berjalan autocommit (lihat environment.before_all) supaya row user
+    # dan django_session sudah committed ketika runserver memvalidasi
+    # cookie-nya lewat koneksinya sendiri
+    client = Client()
+    client.force_login(user)
+    session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    context.driver.get(f'{context.base_url}/login/')  # harus di domain utk set cookie
+    context.driver.add_cookie({
+        'name': settings.SESSION_COOKIE_NAME,
+        'value': session_key,
+        'path': '/',
+    })
 
 
 @given('I am not logged in')
 def step_impl(context):
     """Ensure user is logged out"""
     context.driver.get(f'{context.base_url}/logout/')
-    time.sleep(0.5)
+    wait_for(context, EC.presence_of_element_located((By.TAG_NAME, 'body')))
 
 
 # ============================================================
 # Product/Stock Setup Steps
 # ============================================================
 
+def _bulk_products(profile, rows):
+    """Build product instances di memory, lalu satu bulk_create round-trip"""
+    products = []
+    for row in rows:
+        jumlah = int(row['jumlah_produk'])
+        harga_beli = Decimal(row['harga_beli_satuan'])
+        laba = int(row['laba_persen'])
+        subtotal_beli = jumlah * harga_beli
+        products.append(DaftarBarang(
+            user=profile,
+            nama_product=row['nama_product'],
+            jumlah_produk=jumlah,
+            harga_beli_satuan=harga_beli,
+            laba_persen=laba,
+            subtotal_harga_beli=subtotal_beli,
+            harga_jual_satuan=harga_beli * (100 + laba) / 100,
+            subtotal_harga_jual=subtotal_beli * (100 + laba) / 100,
+        ))
+    # ignore_conflicts: background tables boleh overlap antar scenario outline
+    DaftarBarang.objects.bulk_create(products, batch_size=1000, ignore_conflicts=True)
+
+
 @given('the following products exist')
 def step_impl(context):
     """Setup products dari table"""
-    for row in context.table:
-        DaftarBarangFactory(
-            user=context.profile,
-            nama_product=row['nama_product'],
-            jumlah_produk=int(row['jumlah_produk']),
-            harga_beli_satuan=Decimal(row['harga_beli_satuan']),
-            laba_persen=int(row['laba_persen'])
-        )
+    _bulk_products(context.profile, context.table)
 
 
 @given('"{product_name}" has only {stock:d} units in stock')
 def step_impl(context, product_name, stock):
     """Set specific stock for product"""
-    product = DaftarBarang.objects.get(
-        user=context.profile,
-        nama_product=product_name
-    )
-    product.jumlah_produk = stock
-    product.save()
+    # Satu UPDATE, tanpa SELECT, tanpa signal
+    DaftarBarang.objects.filter(
+        user=context.profile, nama_product=product_name
+    ).update(jumlah_produk=stock)
+    cached = context._product_cache.get(product_name)
+    if cached is not None:
+        cached.jumlah_produk = stock
 
 
 @given('I have completed a transaction with ID "{trans_id}"')
@@ -89,10 +171,11 @@ def step_impl(context, trans_id):
 
 @given('I have completed {count:d} transactions today')
 def step_impl(context, count):
-    """Setup multiple transactions"""
-    from tests.factories import DaftarTransaksiFactory
-    for _ in range(count):
-        DaftarTransaksiFactory(user=context.profile)
+    """Setup multiple transactions dengan satu bulk INSERT"""
+    DaftarTransaksi.objects.bulk_create(
+        [DaftarTransaksi(user=context.profile) for _ in range(count)],
+        batch_size=500,
+    )
 
 
 @given('I have transactions from "{start_date}" to "{end_date}"')
@@ -105,98 +188,108 @@ def step_impl(context, start_date, end_date):
 def step_impl(context, username):
     """Setup another user's products"""
     other_user = UserFactory(username=username)
-    DaftarBarangFactory(user=other_user.profile)
+    _bulk_products(other_user.profile, [{
+        'nama_product': f'Produk {username}',
+        'jumlah_produk': '10',
+        'harga_beli_satuan': '5000',
+        'laba_persen': '20',
+    }])
 
 
 @given('I have completed transactions today totaling {amount:d}')
 def step_impl(context, amount):
     """Setup transactions with total amount"""
-    from tests.factories import DaftarTransaksiFactory
-    DaftarTransaksiFactory(user=context.profile, total=Decimal(str(amount)))
+    DaftarTransaksi.objects.create(user=context.profile, total=Decimal(str(amount)))
 
 
 # ============================================================
 # Navigation Steps
 # ============================================================
 
+# page name -> (url, sentinel element yang menandakan page siap dipakai)
+PAGES = {
+    'Total Stock': ('/stock/', (By.ID, 'dataTable')),
+    'Input Stock': ('/input/', (By.ID, 'inputStockAdder')),
+    'Transaksi': ('/cart/', (By.ID, 'transactionAdderForm')),
+    'Daftar Pembelian': ('/purchase/', (By.ID, 'dataTable')),
+    'Report': ('/report/', (By.TAG_NAME, 'body')),
+    'Dashboard': ('/', (By.TAG_NAME, 'body')),
+    'Login': ('/login/', (By.NAME, 'username')),
+    'Register': ('/register/', (By.NAME, 'username')),
+    'Account': ('/accounts/', (By.TAG_NAME, 'body')),
+}
+
+
+def _nav(context, page_name):
+    """Navigate lalu tunggu sentinel spesifik page, bukan sleep tetap"""
+    url, sentinel = PAGES.get(page_name, ('/', (By.TAG_NAME, 'body')))
+    context.driver.get(f'{context.base_url}{url}')
+    wait_for(context, EC.presence_of_element_located(sentinel))
+
+
 @when('I visit the "{page_name}" page')
 def step_impl(context, page_name):
     """Navigate to specific page"""
-    page_urls = {
-        'Total Stock': '/stock/',
-        'Input Stock': '/input/',
-        'Transaksi': '/cart/',
-        'Daftar Pembelian': '/purchase/',
-        'Report': '/report/',
-        'Dashboard': '/',
-        'Login': '/login/',
-        'Register': '/register/',
-        'Account': '/accounts/',
-    }
-    
-    url = page_urls.get(page_name, '/')
-    context.driver.get(f'{context.base_url}{url}')
-    time.sleep(0.5)
+    _nav(context, page_name)
 
 
 @when('I visit the receipt page for transaction "{trans_id}"')
 def step_impl(context, trans_id):
     """Navigate to receipt page"""
     context.driver.get(f'{context.base_url}/struck/{trans_id}/')
-    time.sleep(0.5)
+    wait_for(context, EC.presence_of_element_located((By.TAG_NAME, 'body')))
 
 
 @when('I try to visit the "{page_name}" page')
 def step_impl(context, page_name):
-    """Try to navigate (might be blocked)"""
-    step_impl(context, page_name)
+    """Try to navigate (might be blocked, jadi sentinel boleh tidak muncul)"""
+    url, _ = PAGES.get(page_name, ('/', None))
+    context.driver.get(f'{context.base_url}{url}')
+    wait_for(context, EC.presence_of_element_located((By.TAG_NAME, 'body')))
 
 
 # ============================================================
 # Stock Management Steps
 # ============================================================
 
+def _product_field_map(row, index):
+    """Map input element id -> value untuk satu baris formset produk"""
+    return {
+        f'id_form-{index}-nama_product': row['nama_product'],
+        f'id_form-{index}-jumlah_produk': row['jumlah_produk'],
+        f'id_form-{index}-harga_beli_satuan': row['harga_beli_satuan'],
+        f'id_form-{index}-laba_persen': row['laba_persen'],
+    }
+
+
 @when('I add a new product')
 def step_impl(context):
     """Add single product"""
     for row in context.table:
-        context.driver.find_element(By.ID, 'id_form-0-nama_product').send_keys(row['nama_product'])
-        context.driver.find_element(By.ID, 'id_form-0-jumlah_produk').send_keys(row['jumlah_produk'])
-        context.driver.find_element(By.ID, 'id_form-0-harga_beli_satuan').send_keys(row['harga_beli_satuan'])
-        context.driver.find_element(By.ID, 'id_form-0-laba_persen').send_keys(row['laba_persen'])
+        _fill_fields(context, _product_field_map(row, 0))
 
 
 @when('I add multiple products')
 def step_impl(context):
     """Add multiple products"""
-    # First product
-    first_row = context.table[0]
-    context.driver.find_element(By.ID, 'id_form-0-nama_product').send_keys(first_row['nama_product'])
-    context.driver.find_element(By.ID, 'id_form-0-jumlah_produk').send_keys(first_row['jumlah_produk'])
-    context.driver.find_element(By.ID, 'id_form-0-harga_beli_satuan').send_keys(first_row['harga_beli_satuan'])
-    context.driver.find_element(By.ID, 'id_form-0-laba_persen').send_keys(first_row['laba_persen'])
-    
-    # Click "Tambah Barang" for additional products
-    for i, row in enumerate(context.table[1:], start=1):
+    # Click "Tambah Barang" until semua formset row tersedia
+    for i in range(1, len(context.table.rows)):
         add_button = context.driver.find_element(By.ID, 'inputStockAdder')
         add_button.click()
-        time.sleep(0.3)
-        
-        # Fill new form
-        context.driver.find_element(By.ID, f'id_form-{i}-nama_product').send_keys(row['nama_product'])
-        context.driver.find_element(By.ID, f'id_form-{i}-jumlah_produk').send_keys(row['jumlah_produk'])
-        context.driver.find_element(By.ID, f'id_form-{i}-harga_beli_satuan').send_keys(row['harga_beli_satuan'])
-        context.driver.find_element(By.ID, f'id_form-{i}-laba_persen').send_keys(row['laba_persen'])
+        wait_for(context, EC.presence_of_element_located((By.ID, f'id_form-{i}-nama_product')))
+
+    # Isi semua field sekaligus dalam satu execute_script round-trip
+    field_map = {}
+    for i, row in enumerate(context.table):
+        field_map.update(_product_field_map(row, i))
+    _fill_fields(context, field_map)
 
 
 @when('I enter product details')
 def step_impl(context):
     """Enter product details"""
     for row in context.table:
-        context.driver.find_element(By.ID, 'id_form-0-nama_product').send_keys(row['nama_product'])
-        context.driver.find_element(By.ID, 'id_form-0-jumlah_produk').send_keys(row['jumlah_produk'])
-        context.driver.find_element(By.ID, 'id_form-0-harga_beli_satuan').send_keys(row['harga_beli_satuan'])
-        context.driver.find_element(By.ID, 'id_form-0-laba_persen').send_keys(row['laba_persen'])
+        _fill_fields(context, _product_field_map(row, 0))
 
 
 @when('I enter incomplete product details')
@@ -216,7 +309,7 @@ def step_impl(context):
 @when('I select product "{product_name}"')
 def step_impl(context, product_name):
     """Select product from dropdown"""
-    product = DaftarBarang.objects.get(user=context.profile, nama_product=product_name)
+    product = _get_product(context, product_name)
     select_element = Select(context.driver.find_element(By.NAME, 'form-0-nama_barang'))
     select_element.select_by_value(str(product.nomor))
 
@@ -237,9 +330,9 @@ def step_impl(context):
             # Click add button for additional rows
             add_button = context.driver.find_element(By.ID, 'transactionAdderForm')
             add_button.click()
-            time.sleep(0.3)
+            wait_for(context, EC.presence_of_element_located((By.NAME, f'form-{i}-nama_barang')))
         
-        product = DaftarBarang.objects.get(user=context.profile, nama_product=row['nama_product'])
+        product = _get_product(context, row['nama_product'])
         select_element = Select(context.driver.find_element(By.NAME, f'form-{i}-nama_barang'))
         select_element.select_by_value(str(product.nomor))
         
@@ -265,7 +358,7 @@ def step_impl(context, button_text):
     selector = button_texts.get(button_text, 'button[type="submit"]')
     button = context.driver.find_element(By.CSS_SELECTOR, selector)
     button.click()
-    time.sleep(1)
+    wait_for(context, EC.staleness_of(button))  # submit navigates away
 
 
 # ============================================================
@@ -284,14 +377,15 @@ def step_impl(context, count):
 @then('I should see "{product_name}" with stock {stock:d}')
 def step_impl(context, product_name, stock):
     """Assert product and stock visible"""
-    page_source = context.driver.page_source
-    assert product_name in page_source
-    assert str(stock) in page_source
+    page_text = _page_text(context)
+    assert product_name in page_text
+    assert str(stock) in page_text
 
 
 @then('I should see a success message')
 def step_impl(context):
     """Assert success message"""
+    wait_for(context, EC.presence_of_element_located((By.CLASS_NAME, 'alert-success')), timeout=5)
     messages = context.driver.find_elements(By.CLASS_NAME, 'alert-success')
     assert len(messages) > 0, "No success message found"
 
@@ -314,17 +408,14 @@ def step_impl(context):
 @then('the product "{product_name}" should be in the stock list')
 def step_impl(context, product_name):
     """Assert product in stock"""
-    exists = DaftarBarang.objects.filter(
-        user=context.profile,
-        nama_product=product_name
-    ).exists()
-    assert exists, f"Product {product_name} not found in database"
+    assert product_name in _owned_names(context), \
+        f"Product {product_name} not found in database"
 
 
 @then('"{product_name}" should have calculated prices')
 def step_impl(context, product_name):
     """Assert calculated prices"""
-    product = DaftarBarang.objects.get(user=context.profile, nama_product=product_name)
+    product = _get_product(context, product_name, refresh=True)
     
     for row in context.table:
         for field in row.headings:
@@ -350,37 +441,44 @@ def step_impl(context):
 @then('I should be redirected to the receipt page')
 def step_impl(context):
     """Assert redirect to receipt"""
-    time.sleep(1)
+    wait_for(context, EC.url_contains('/struck/'))
     assert '/struck/' in context.driver.current_url
 
 
 @then('the receipt should show')
 def step_impl(context):
     """Assert receipt details"""
+    page_text = _page_text(context)
     for row in context.table:
         for field in row.headings:
-            assert row[field] in context.driver.page_source
+            assert row[field] in page_text
 
 
 @then('the stock of "{product_name}" should be reduced to {new_stock:d}')
 def step_impl(context, product_name, new_stock):
     """Assert stock reduced"""
-    product = DaftarBarang.objects.get(user=context.profile, nama_product=product_name)
+    product = _get_product(context, product_name, refresh=True)
     assert product.jumlah_produk == new_stock, f"Expected stock {new_stock}, got {product.jumlah_produk}"
 
 
 @then('the total should be {amount:d}')
 def step_impl(context, amount):
     """Assert transaction total"""
-    assert str(amount) in context.driver.page_source
+    assert str(amount) in _page_text(context)
 
 
 @then('the stocks should be updated')
 def step_impl(context):
-    """Assert multiple stock updates"""
+    """Assert multiple stock updates dengan satu IN query"""
+    products = {
+        p.nama_product: p
+        for p in DaftarBarang.objects.filter(
+            user=context.profile,
+            nama_product__in=[row['nama_product'] for row in context.table],
+        )
+    }
     for row in context.table:
-        product = DaftarBarang.objects.get(user=context.profile, nama_product=row['nama_product'])
-        assert product.jumlah_produk == int(row['new_stock'])
+        assert products[row['nama_product']].jumlah_produk == int(row['new_stock'])
 
 
 @then('the transaction should not be created')
@@ -393,31 +491,28 @@ def step_impl(context):
 @then('the stock of "{product_name}" should remain {stock:d}')
 def step_impl(context, product_name, stock):
     """Assert stock unchanged"""
-    product = DaftarBarang.objects.get(user=context.profile, nama_product=product_name)
+    product = _get_product(context, product_name, refresh=True)
     assert product.jumlah_produk == stock
 
 
 @then('"{product_name}" should no longer appear in stock list')
 def step_impl(context, product_name):
     """Assert product deleted"""
-    exists = DaftarBarang.objects.filter(
-        user=context.profile,
-        nama_product=product_name
-    ).exists()
-    assert not exists, f"Product {product_name} still exists in database"
+    assert product_name not in _owned_names(context), \
+        f"Product {product_name} still exists in database"
 
 
 @then('I should be redirected to the login page')
 def step_impl(context):
     """Assert redirect to login"""
-    time.sleep(1)
+    wait_for(context, EC.url_contains('/login/'))
     assert '/login/' in context.driver.current_url
 
 
 @then('I should be logged in successfully')
 def step_impl(context):
     """Assert successful login"""
-    time.sleep(1)
+    wait_for(context, lambda driver: '/login/' not in driver.current_url)
     assert '/login/' not in context.driver.current_url
 
 
@@ -430,11 +525,13 @@ def step_impl(context):
 @then('I should not see "{username}"\'s products')
 def step_impl(context, username):
     """Assert other user's products not visible"""
-    other_user = User.objects.get(username=username)
-    other_products = DaftarBarang.objects.filter(user=other_user.profile)
-    
-    for product in other_products:
-        assert product.nama_product not in context.driver.page_source
+    other_names = DaftarBarang.objects.filter(
+        user__user__username=username
+    ).values_list('nama_product', flat=True)
+
+    page_text = _page_text(context)
+    for name in other_names:
+        assert name not in page_text
 
 
 @then('I should only see my own products')
@@ -448,26 +545,41 @@ def step_impl(context):
 @then('I should see "{text}" showing "{value}"')
 def step_impl(context, text, value):
     """Assert specific text and value"""
-    assert text in context.driver.page_source
-    assert value in context.driver.page_source
+    page_text = _page_text(context)
+    assert text in page_text
+    assert value in page_text
 
 
 # ============================================================
 # User Management Steps
 # ============================================================
 
+_FILL_FIELDS_BY_NAME_JS = (
+    "const data = arguments[0];"
+    "for (const [name, value] of Object.entries(data)) {"
+    "    const el = document.getElementsByName(name)[0];"
+    "    el.value = value;"
+    "    el.dispatchEvent(new Event('input', {bubbles: true}));"
+    "    el.dispatchEvent(new Event('change', {bubbles: true}));"
+    "}"
+)
+
+
 @when('I fill in the registration form')
 def step_impl(context):
     """Fill registration form"""
+    name_map = {
+        'username': 'username',
+        'email': 'email',
+        'password': 'password1',
+        'confirm_password': 'password2',
+    }
     for row in context.table:
-        if 'username' in row.headings:
-            context.driver.find_element(By.NAME, 'username').send_keys(row['username'])
-        if 'email' in row.headings:
-            context.driver.find_element(By.NAME, 'email').send_keys(row['email'])
-        if 'password' in row.headings:
-            context.driver.find_element(By.NAME, 'password1').send_keys(row['password'])
-        if 'confirm_password' in row.headings:
-            context.driver.find_element(By.NAME, 'password2').send_keys(row['confirm_password'])
+        field_map = {
+            name_map[field]: row[field]
+            for field in row.headings if field in name_map
+        }
+        context.driver.execute_script(_FILL_FIELDS_BY_NAME_JS, field_map)
 
 
 @when('I enter username "{username}" and password "{password}"')
@@ -481,10 +593,8 @@ def step_impl(context, username, password):
 def step_impl(context):
     """Update profile fields"""
     for row in context.table:
-        for field in row.headings:
-            element = context.driver.find_element(By.NAME, field)
-            element.clear()
-            element.send_keys(row[field])
+        field_map = {field: row[field] for field in row.headings}
+        context.driver.execute_script(_FILL_FIELDS_BY_NAME_JS, field_map)
 
 
 @then('a new profile should be created for "{username}"')
@@ -497,10 +607,16 @@ def step_impl(context, username):
 @then('I should see my profile information')
 def step_impl(context):
     """Assert profile info visible"""
-    assert context.user.username in context.driver.page_source
+    assert context.user.username in _page_text(context)
 
 
 @then('my profile should be updated')
 def step_impl(context):
     """Assert profile updated in DB"""
-    context.profile.refresh_from_database()
\ No newline at end of file
+    # refresh_from_db (bukan refresh_from_database); limit ke kolom yang
+    # memang diubah kalau step dipanggil dengan table
+    if context.table:
+        fields = {h for row in context.table for h in row.headings}
+        context.profile.refresh_from_db(fields=list(fields))
+    else:
+        context.profile.refresh_from_db()
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Konfigurasi pytest untuk folder tests/
+"""
+import logging
+
+import pytest
+
+
+def pytest_configure(config):
+    """
+    Hash password dengan MD5 selama test: PBKDF2 (ratusan ribu iterasi)
+    hanya perlu di production, di test yang penting hash-nya konsisten.
+    Di-set sebelum tests/factories.py ter-import supaya hash default
+    yang dihitung di import time ikut murah.
+    """
+    from django.conf import settings
+
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+    # Logger django di settings menulis ke file server.log per request;
+    # selama test semua logging dimatikan (pytest-django sudah memaksa
+    # DEBUG=False sendiri).
+    settings.LOGGING = {'version': 1, 'disable_existing_loggers': True}
+    logging.disable(logging.CRITICAL)
+
+    # Cached template loader: parse tree template di-memoize, view test
+    # tidak men-stat direktori template per render (APP_DIRS harus
+    # dilepas kalau loaders dieksplisitkan)
+    settings.TEMPLATES[0]['APP_DIRS'] = False
+    settings.TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """
+    Pakai SQLite in-memory untuk test DB: setiap INSERT/teardown bebas
+    fsync dan schema setup tidak menyentuh disk sama sekali.
+    """
+    from django.conf import settings
+
+    settings.DATABASES['default'].setdefault('TEST', {})
+    settings.DATABASES['default']['TEST']['NAME'] = ':memory:'
+
+
+@pytest.fixture(scope='session', autouse=True)
+def no_profile_signals():
+    """
+    Lepas receiver post_save User selama suite: create_profile (INSERT
+    Profile ekstra per UserFactory) dan save_profile (ikut dilepas karena
+    meng-akses instance.profile yang tidak ada tanpa create_profile).
+    Test yang memang menguji signal pakai fixture profile_signals untuk
+    menyambungkan kembali sementara.
+    """
+    from django.contrib.auth.models import User
+    from django.db.models.signals import post_save
+    from accounts.signals import create_profile, save_profile
+
+    post_save.disconnect(create_profile, sender=User)
+    post_save.disconnect(save_profile, sender=User)
+    yield
+    post_save.connect(create_profile, sender=User)
+    post_save.connect(save_profile, sender=User)
+
+
+@pytest.fixture
+def profile_signals(no_profile_signals):
+    """Sambungkan kembali receiver post_save User untuk satu test"""
+    from django.contrib.auth.models import User
+    from django.db.models.signals import post_save
+    from accounts.signals import create_profile, save_profile
+
+    post_save.connect(create_profile, sender=User)
+    post_save.connect(save_profile, sender=User)
+    yield
+    post_save.disconnect(create_profile, sender=User)
+    post_save.disconnect(save_profile, sender=User)
+
+
+def pytest_collection_modifyitems(items):
+    """
+    Test di repo ini pytest-only. Class yang mewarisi django.test.TestCase
+    sekaligus memakai @pytest.mark.django_db akan dibungkus transaksi dua
+    kali (double BEGIN/ROLLBACK per test) - tolak saat collection.
+    """
+    from django.test import SimpleTestCase
+
+    for item in items:
+        cls = getattr(item, 'cls', None)
+        if (cls is not None
+                and issubclass(cls, SimpleTestCase)
+                and item.get_closest_marker('django_db') is not None):
+            raise pytest.UsageError(
+                f'{cls.__name__} mewarisi TestCase dan memakai django_db - '
+                'pilih salah satu (gaya repo: pytest class + django_db)'
+            )
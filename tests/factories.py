@@ -2,11 +2,15 @@
 Test Factories untuk Generate Fake Data
 Menggunakan Factory Boy + Faker
 """
+import random
+
 import factory
 from factory.django import DjangoModelFactory
 from factory.fuzzy import FuzzyChoice, FuzzyInteger, FuzzyDecimal
 from faker import Faker
 from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 
 from accounts.models import Profile
@@ -15,32 +19,66 @@ from data.models import Stock
 
 fake = Faker('id_ID')  # Indonesian locale
 
+# Pool nilai Faker yang di-generate sekali di import time; factory tinggal
+# sampling dari list (factory.Faker memanggil provider id_ID per instansiasi,
+# yang dominan di test yang membuat ratusan object)
+_WORDS = [fake.word() for _ in range(2048)]
+_FIRST_NAMES = [fake.first_name() for _ in range(1024)]
+_LAST_NAMES = [fake.last_name() for _ in range(1024)]
+_CITIES = [fake.city() for _ in range(1024)]
+_STATES = [fake.state() for _ in range(1024)]
+_ADDRESSES = [fake.address() for _ in range(1024)]
+_POSTCODES = [fake.postcode() for _ in range(1024)]
+_PHONE_NUMBERS = [fake.msisdn() for _ in range(1024)]
+
+# Pool angka untuk factory yang paling sering dipanggil; FuzzyInteger/
+# FuzzyDecimal memanggil random + Decimal(str(float)) per build, cycle
+# lewat factory.Iterator tinggal ambil nilai berikutnya. Seed tetap
+# supaya deterministik antar run.
+_rng = random.Random(0)
+_PRICES = tuple(Decimal(_rng.randint(1000, 100000)) for _ in range(1024))
+_QUANTITIES = tuple(_rng.randint(10, 1000) for _ in range(1024))
+_UNITS = tuple(_rng.randint(1, 10) for _ in range(1024))
+_LABA_PERSEN = tuple(_rng.randint(10, 50) for _ in range(1024))
+_STOCK_PRICES = tuple(_rng.randint(1000, 100000) for _ in range(1024))
+
+# PBKDF2 adalah operasi termahal di UserFactory; hash default cukup
+# dihitung sekali, set_password hanya untuk password eksplisit
+_DEFAULT_HASHED_PASSWORD = make_password('testpass123')
+
 # ============================================================
 # User & Profile Factories
 # ============================================================
 
 class UserFactory(DjangoModelFactory):
-    """Factory untuk Django User"""
+    """
+    Factory untuk Django User.
+
+    Receiver post_save (create_profile/save_profile) dilepas session-wide
+    oleh fixture no_profile_signals di tests/conftest.py, jadi factory ini
+    tidak perlu mute_signals sendiri - dan tetap memicu signal kalau
+    dipakai di luar pytest (behave steps).
+    """
     class Meta:
         model = User
         django_get_or_create = ('username',)
     
     username = factory.Sequence(lambda n: f'user{n}')
     email = factory.LazyAttribute(lambda obj: f'{obj.username}@example.com')
-    first_name = factory.Faker('first_name', locale='id_ID')
-    last_name = factory.Faker('last_name', locale='id_ID')
+    first_name = FuzzyChoice(_FIRST_NAMES)
+    last_name = FuzzyChoice(_LAST_NAMES)
     is_active = True
     is_staff = False
     is_superuser = False
     
-    @factory.post_generation
-    def password(self, create, extracted, **kwargs):
-        if not create:
-            return
-        if extracted:
-            self.set_password(extracted)
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        """Hash password sebelum INSERT supaya create user = 1 statement"""
+        if 'password' in kwargs:
+            kwargs['password'] = make_password(kwargs['password'])
         else:
-            self.set_password('testpass123')
+            kwargs['password'] = _DEFAULT_HASHED_PASSWORD
+        return super()._create(model_class, *args, **kwargs)
 
 
 class ProfileFactory(DjangoModelFactory):
@@ -50,16 +88,54 @@ class ProfileFactory(DjangoModelFactory):
     
     user = factory.SubFactory(UserFactory)
     picture = 'profile_pictures/default.png'
-    nama_depan = factory.Faker('first_name', locale='id_ID')
-    nama_belakang = factory.Faker('last_name', locale='id_ID')
+    nama_depan = FuzzyChoice(_FIRST_NAMES)
+    nama_belakang = FuzzyChoice(_LAST_NAMES)
     email = factory.LazyAttribute(lambda obj: f'{obj.nama_depan.lower()}@example.com')
-    nomor_telephone = factory.Faker('phone_number', locale='id_ID')
-    provinsi = factory.Faker('state', locale='id_ID')
-    kota = factory.Faker('city', locale='id_ID')
-    kecamatan = factory.Faker('city', locale='id_ID')
-    kelurahan = factory.Faker('city', locale='id_ID')
-    alamat = factory.Faker('address', locale='id_ID')
-    kode_pos = factory.Faker('postcode', locale='id_ID')
+    nomor_telephone = FuzzyChoice(_PHONE_NUMBERS)
+    provinsi = FuzzyChoice(_STATES)
+    kota = FuzzyChoice(_CITIES)
+    kecamatan = FuzzyChoice(_CITIES)
+    kelurahan = FuzzyChoice(_CITIES)
+    alamat = FuzzyChoice(_ADDRESSES)
+    kode_pos = FuzzyChoice(_POSTCODES)
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        """Sync dengan Profile yang otomatis dibuat oleh post_save signal"""
+        user = kwargs.pop('user')
+        obj, _ = model_class.objects.get_or_create(user=user, defaults=kwargs)
+        for field, value in kwargs.items():
+            setattr(obj, field, value)
+        obj.save()
+        return obj
+
+
+def bulk_create_batch(factory_cls, n, **kwargs):
+    """
+    build_batch di memory + satu bulk_create, pengganti create_batch
+    (N INSERT) untuk setup multi-row yang hanya dibaca oleh test.
+    """
+    objs = factory_cls.build_batch(n, **kwargs)
+    return factory_cls._meta.model.objects.bulk_create(objs)
+
+
+def bulk_profiles(n, username_prefix='bulk', **overrides):
+    """
+    Build n Profile di memory lalu commit lewat dua bulk_create
+    (2 statement, tanpa save()/signal per row) - untuk fixture read-only.
+    """
+    User.objects.bulk_create(
+        [User(username=f'{username_prefix}{i}') for i in range(n)],
+        ignore_conflicts=True,
+    )
+    # sqlite tidak mengembalikan pk dari bulk_create (Django 2.2)
+    users = list(
+        User.objects.filter(username__startswith=username_prefix).order_by('id')[:n]
+    )
+    return Profile.objects.bulk_create([
+        ProfileFactory.build(user=user, email=f'{user.username}@example.com', **overrides)
+        for user in users
+    ])
 
 
 # ============================================================
@@ -72,7 +148,7 @@ class StockFactory(DjangoModelFactory):
         model = Stock
     
     name = factory.Sequence(lambda n: f'Product-{n}')
-    price = FuzzyInteger(1000, 100000)
+    price = factory.Iterator(_STOCK_PRICES)
 
 
 # ============================================================
@@ -85,26 +161,28 @@ class DaftarBarangFactory(DjangoModelFactory):
         model = DaftarBarang
     
     user = factory.SubFactory(ProfileFactory)
-    nama_product = factory.Faker('word', locale='id_ID')
-    jumlah_produk = FuzzyInteger(10, 1000)
-    unit_produk = FuzzyInteger(1, 10)
-    harga_beli_satuan = FuzzyDecimal(1000.0, 100000.0, 2)
-    laba_persen = FuzzyInteger(10, 50)
+    nama_product = FuzzyChoice(_WORDS)
+    jumlah_produk = factory.Iterator(_QUANTITIES)
+    unit_produk = factory.Iterator(_UNITS)
+    harga_beli_satuan = factory.Iterator(_PRICES)
+    laba_persen = factory.Iterator(_LABA_PERSEN)
     
-    # Calculated fields - will be set by form/model save()
+    # Calculated fields - diisi di _create (tanpa menimpa nilai eksplisit)
     subtotal_harga_beli = None
     harga_jual_satuan = None
     subtotal_harga_jual = None
-    
-    @factory.post_generation
-    def calculate_prices(obj, create, extracted, **kwargs):
-        """Calculate prices after creation"""
-        if create:
-            obj.subtotal_harga_beli = obj.jumlah_produk * obj.harga_beli_satuan
-            obj.harga_jual_satuan = obj.harga_beli_satuan * (1 + obj.laba_persen / 100)
-            laba = obj.laba_persen * obj.subtotal_harga_beli / 100
-            obj.subtotal_harga_jual = laba + obj.subtotal_harga_beli
-            obj.save()
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        """Hitung field harga sebelum INSERT supaya tidak perlu save() kedua"""
+        if kwargs.get('subtotal_harga_beli') is None:
+            kwargs['subtotal_harga_beli'] = kwargs['jumlah_produk'] * kwargs['harga_beli_satuan']
+        if kwargs.get('harga_jual_satuan') is None:
+            kwargs['harga_jual_satuan'] = kwargs['harga_beli_satuan'] * (100 + kwargs['laba_persen']) / 100
+        if kwargs.get('subtotal_harga_jual') is None:
+            laba = kwargs['laba_persen'] * kwargs['subtotal_harga_beli'] / 100
+            kwargs['subtotal_harga_jual'] = laba + kwargs['subtotal_harga_beli']
+        return super()._create(model_class, *args, **kwargs)
 
 
 class DaftarTransaksiFactory(DjangoModelFactory):
@@ -123,7 +201,7 @@ class ListProductTransaksiFactory(DjangoModelFactory):
         model = ListProductTransaksi
     
     transaksi_id = factory.SubFactory(DaftarTransaksiFactory)
-    nama_barang = factory.Faker('word', locale='id_ID')
+    nama_barang = FuzzyChoice(_WORDS)
     quantity = FuzzyInteger(1, 20)
     subtotal = FuzzyInteger(10000, 500000)
 
@@ -3,23 +3,39 @@ API Tests untuk REST API Endpoints
 Testing API dengan Django REST Framework
 """
 import pytest
-import json
+import orjson
+from django.contrib.auth.models import User
 from django.test import Client
 from django.urls import reverse
+from faker import Faker
 from rest_framework import status
 
 from accounts.models import Profile
-from tests.factories import UserFactory, ProfileFactory
+from tests.factories import UserFactory, ProfileFactory, bulk_profiles
+
+fake = Faker('id_ID')
+
+# reverse() jalan-jalan di URLconf setiap dipanggil; URL API stabil,
+# cukup dihitung sekali di import time
+API_LIST_URL = reverse('ApiList')
+API_DETAIL_TPL = reverse('ApiDetail', kwargs={'pk': 0}).replace('/0/', '/{}/')
 
 
 # ============================================================
 # Test Setup
 # ============================================================
 
+# Satu Client dipakai ulang oleh semua test (middleware chain hanya
+# di-setup sekali); fixture cukup mereset cookie supaya session/login
+# tidak bocor antar test
+_shared_client = Client()
+
+
 @pytest.fixture
 def api_client():
-    """API test client"""
-    return Client()
+    """API test client (shared instance, cookies direset per test)"""
+    _shared_client.cookies.clear()
+    return _shared_client
 
 
 @pytest.fixture
@@ -31,24 +47,53 @@ def authenticated_api_client(api_client):
     return api_client
 
 
+@pytest.fixture(scope='class')
+def class_authenticated_client(django_db_setup, django_db_blocker):
+    """
+    Client yang login sekali per class (user-nya committed lewat
+    django_db_blocker, pola yang sama dengan seeded_profiles) untuk
+    test POST yang diparametrize: 1 INSERT + 1 force_login, bukan 6.
+    """
+    with django_db_blocker.unblock():
+        user, _ = User.objects.get_or_create(username='api_post_user')
+        client = Client()
+        client.force_login(user)
+    return client
+
+
+@pytest.fixture(scope='session')
+def seeded_profiles(django_db_setup, django_db_blocker):
+    """
+    50 profile read-only, di-seed sekali per session lewat bulk_create
+    (2 statement, tanpa signal/save() per row) untuk test list/filter/
+    pagination. Test yang memutasi data tetap pakai factory per test.
+    """
+    with django_db_blocker.unblock():
+        # Idempotent supaya aman dengan --reuse-db (seed sudah committed
+        # di database yang dipakai ulang antar run)
+        if not User.objects.filter(username='seed_sby0').exists():
+            bulk_profiles(25, username_prefix='seed_sby', kota='Surabaya')
+            bulk_profiles(25, username_prefix='seed_jkt', kota='Jakarta')
+        profiles = list(Profile.objects.filter(user__username__startswith='seed_'))
+    return profiles
+
+
 # ============================================================
 # Profile API Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestProfileAPI:
     """Test Profile API Endpoints"""
     
-    def test_api_list_profiles(self, api_client):
+    def test_api_list_profiles(self, api_client, seeded_profiles):
         """Test GET /auth/api/ returns profile list"""
-        ProfileFactory.create_batch(5)
-        
-        response = api_client.get(reverse('ApiList'))
+        response = api_client.get(API_LIST_URL)
         assert response.status_code == status.HTTP_200_OK
-        
+
         data = response.json()
-        assert len(data) >= 5
+        assert len(data) >= len(seeded_profiles)
     
     def test_api_get_profile_detail(self, api_client):
         """Test GET /auth/api/{id}/ returns profile detail"""
@@ -58,7 +103,7 @@ class TestProfileAPI:
             email='john@example.com'
         )
         
-        url = reverse('ApiDetail', kwargs={'pk': profile.id})
+        url = API_DETAIL_TPL.format(profile.id)
         response = api_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
@@ -69,52 +114,11 @@ class TestProfileAPI:
     
     def test_api_get_nonexistent_profile(self, api_client):
         """Test GET profile yang tidak ada returns 404"""
-        url = reverse('ApiDetail', kwargs={'pk': 99999})
+        url = API_DETAIL_TPL.format(99999)
         response = api_client.get(url)
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
     
-    def test_api_create_profile(self, authenticated_api_client):
-        """Test POST /auth/api/ creates new profile"""
-        profile_data = {
-            'nama_depan': 'Jane',
-            'nama_belakang': 'Smith',
-            'email': 'jane@example.com',
-            'nomor_telephone': '081234567890',
-            'provinsi': 'Jawa Timur',
-            'kota': 'Surabaya',
-            'kecamatan': 'Gubeng',
-            'kelurahan': 'Airlangga',
-            'alamat': 'Jl. Test No. 123',
-            'kode_pos': '60286',
-        }
-        
-        response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(profile_data),
-            content_type='application/json'
-        )
-        
-        assert response.status_code == status.HTTP_201_CREATED
-        data = response.json()
-        assert data['nama_depan'] == 'Jane'
-        assert data['email'] == 'jane@example.com'
-    
-    def test_api_create_profile_invalid_data(self, authenticated_api_client):
-        """Test POST dengan data invalid returns 400"""
-        invalid_data = {
-            'nama_depan': '',  # Empty
-            'email': 'invalid-email',  # Invalid format
-        }
-        
-        response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(invalid_data),
-            content_type='application/json'
-        )
-        
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-    
     def test_api_update_profile(self, authenticated_api_client):
         """Test PUT /auth/api/{id}/ updates profile"""
         user = authenticated_api_client.user
@@ -133,10 +137,10 @@ class TestProfileAPI:
             'kode_pos': '12190',
         }
         
-        url = reverse('ApiDetail', kwargs={'pk': profile.id})
+        url = API_DETAIL_TPL.format(profile.id)
         response = authenticated_api_client.put(
             url,
-            data=json.dumps(update_data),
+            data=orjson.dumps(update_data),
             content_type='application/json'
         )
         
@@ -146,7 +150,7 @@ class TestProfileAPI:
         assert data['email'] == 'updated@example.com'
         
         # Verify in database
-        profile.refresh_from_database()
+        profile.refresh_from_db(fields=['nama_depan', 'email'])
         assert profile.nama_depan == 'Updated'
     
     def test_api_partial_update_profile(self, authenticated_api_client):
@@ -163,10 +167,10 @@ class TestProfileAPI:
             # email not included
         }
         
-        url = reverse('ApiDetail', kwargs={'pk': profile.id})
+        url = API_DETAIL_TPL.format(profile.id)
         response = authenticated_api_client.patch(
             url,
-            data=json.dumps(partial_data),
+            data=orjson.dumps(partial_data),
             content_type='application/json'
         )
         
@@ -181,7 +185,7 @@ class TestProfileAPI:
         profile = ProfileFactory(user=user)
         profile_id = profile.id
         
-        url = reverse('ApiDetail', kwargs={'pk': profile_id})
+        url = API_DETAIL_TPL.format(profile_id)
         response = authenticated_api_client.delete(url)
         
         assert response.status_code == status.HTTP_204_NO_CONTENT
@@ -194,51 +198,43 @@ class TestProfileAPI:
 # API Filtering & Search Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestAPIFiltering:
     """Test API filtering dan search"""
     
-    def test_api_filter_by_kota(self, api_client):
+    def test_api_filter_by_kota(self, api_client, seeded_profiles):
         """Test filter profiles by kota"""
-        ProfileFactory(kota='Surabaya')
-        ProfileFactory(kota='Surabaya')
-        ProfileFactory(kota='Jakarta')
-        
-        # Assuming filter parameter exists
-        response = api_client.get(f"{reverse('ApiList')}?kota=Surabaya")
-        
+        # Separuh seeded profile ber-kota Surabaya, sisanya Jakarta
+        response = api_client.get(f"{API_LIST_URL}?kota=Surabaya")
+
         # If filtering is implemented
         # data = response.json()
-        # assert len(data) == 2
-    
-    def test_api_search_by_name(self, api_client):
+        # assert len(data) == len(seeded_profiles) // 2
+
+    def test_api_search_by_name(self, api_client, seeded_profiles):
         """Test search profiles by name"""
-        ProfileFactory(nama_depan='Alice')
-        ProfileFactory(nama_depan='Bob')
-        
         # Assuming search parameter exists
-        response = api_client.get(f"{reverse('ApiList')}?search=Alice")
-        
+        name = seeded_profiles[0].nama_depan
+        response = api_client.get(f"{API_LIST_URL}?search={name}")
+
         # If search is implemented
         # data = response.json()
-        # assert len(data) == 1
+        # assert any(p['nama_depan'] == name for p in data)
 
 
 # ============================================================
 # API Pagination Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestAPIPagination:
     """Test API pagination"""
     
-    def test_api_pagination(self, api_client):
+    def test_api_pagination(self, api_client, seeded_profiles):
         """Test API returns paginated results"""
-        ProfileFactory.create_batch(20)
-        
-        response = api_client.get(reverse('ApiList'))
+        response = api_client.get(API_LIST_URL)
         data = response.json()
         
         # Check if pagination is implemented
@@ -250,14 +246,14 @@ class TestAPIPagination:
 # API Permissions Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestAPIPermissions:
     """Test API permissions"""
     
     def test_api_list_no_auth_required(self, api_client):
         """Test list endpoint tidak memerlukan auth"""
-        response = api_client.get(reverse('ApiList'))
+        response = api_client.get(API_LIST_URL)
         # Currently no auth required based on commented permission_classes
         assert response.status_code == status.HTTP_200_OK
     
@@ -269,8 +265,8 @@ class TestAPIPermissions:
         }
         
         response = api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(profile_data),
+            API_LIST_URL,
+            data=orjson.dumps(profile_data),
             content_type='application/json'
         )
         
@@ -283,40 +279,15 @@ class TestAPIPermissions:
 # API Error Handling Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestAPIErrorHandling:
     """Test API error handling"""
     
-    def test_api_invalid_json(self, authenticated_api_client):
-        """Test POST dengan invalid JSON"""
-        response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data='invalid json',
-            content_type='application/json'
-        )
-        
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-    
-    def test_api_missing_required_fields(self, authenticated_api_client):
-        """Test POST tanpa required fields"""
-        incomplete_data = {
-            'nama_depan': 'Test',
-            # Missing email
-        }
-        
-        response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(incomplete_data),
-            content_type='application/json'
-        )
-        
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-    
     def test_api_invalid_method(self, api_client):
         """Test menggunakan method yang tidak diizinkan"""
         # Assuming PATCH not allowed on list endpoint
-        response = api_client.patch(reverse('ApiList'))
+        response = api_client.patch(API_LIST_URL)
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
 
 
@@ -324,58 +295,73 @@ class TestAPIErrorHandling:
 # API Data Validation Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestAPIDataValidation:
-    """Test API data validation"""
-    
-    def test_api_email_format_validation(self, authenticated_api_client):
-        """Test validasi format email"""
-        invalid_email_data = {
-            'nama_depan': 'Test',
-            'nama_belakang': 'User',
-            'email': 'not-an-email',  # Invalid
-            'nomor_telephone': '081234567890',
-        }
-        
-        response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(invalid_email_data),
-            content_type='application/json'
-        )
-        
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-    
-    def test_api_phone_number_validation(self, authenticated_api_client):
-        """Test validasi nomor telephone"""
-        profile_data = {
-            'nama_depan': 'Test',
-            'email': 'test@example.com',
-            'nomor_telephone': 'invalid-phone',
-        }
-        
-        response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(profile_data),
+    """
+    Test POST /auth/api/ - validasi payload (parametrized)
+    Enam test POST yang dulunya tersebar digabung di sini supaya cukup
+    satu user + satu login per class, bukan per test.
+    """
+
+    VALID_PAYLOAD = {
+        'nama_depan': 'Jane',
+        'nama_belakang': 'Smith',
+        'email': 'jane@example.com',
+        'nomor_telephone': '081234567890',
+        'provinsi': 'Jawa Timur',
+        'kota': 'Surabaya',
+        'kecamatan': 'Gubeng',
+        'kelurahan': 'Airlangga',
+        'alamat': 'Jl. Test No. 123',
+        'kode_pos': '60286',
+    }
+
+    @pytest.mark.parametrize('payload,expected_status', [
+        pytest.param(VALID_PAYLOAD, {201}, id='valid-payload'),
+        pytest.param({'nama_depan': '', 'email': 'invalid-email'}, {400},
+                     id='empty-name-invalid-email'),
+        pytest.param({'nama_depan': 'Test', 'nama_belakang': 'User',
+                      'email': 'not-an-email',
+                      'nomor_telephone': '081234567890'}, {400},
+                     id='invalid-email-format'),
+        # Validasi nomor telephone tergantung serializer
+        pytest.param({'nama_depan': 'Test', 'email': 'test@example.com',
+                      'nomor_telephone': 'invalid-phone'}, {201, 400},
+                     id='invalid-phone-number'),
+        pytest.param({'nama_depan': 'Test'}, {400}, id='missing-email'),
+        pytest.param('invalid json', {400}, id='invalid-json'),
+    ])
+    def test_api_create_validation(self, class_authenticated_client,
+                                   db, payload, expected_status):
+        """Test POST dengan payload valid maupun invalid"""
+        body = payload if isinstance(payload, str) else orjson.dumps(payload)
+        response = class_authenticated_client.post(
+            API_LIST_URL,
+            data=body,
             content_type='application/json'
         )
-        
-        # Might be invalid depending on validation
-        # assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        assert response.status_code in expected_status
+
+        if expected_status == {201}:
+            data = response.json()
+            assert data['nama_depan'] == payload['nama_depan']
+            assert data['email'] == payload['email']
 
 
 # ============================================================
 # API Content Type Tests
 # ============================================================
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=['default'])
 @pytest.mark.api
 class TestAPIContentType:
     """Test API content type handling"""
     
     def test_api_returns_json(self, api_client):
         """Test API returns JSON"""
-        response = api_client.get(reverse('ApiList'))
+        response = api_client.get(API_LIST_URL)
         assert 'application/json' in response['Content-Type']
     
     def test_api_accepts_json(self, authenticated_api_client):
@@ -386,8 +372,8 @@ class TestAPIContentType:
         }
         
         response = authenticated_api_client.post(
-            reverse('ApiList'),
-            data=json.dumps(profile_data),
+            API_LIST_URL,
+            data=orjson.dumps(profile_data),
             content_type='application/json'
         )
         
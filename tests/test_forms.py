@@ -4,7 +4,8 @@ Testing form validation dan business logic
 """
 import pytest
 from decimal import Decimal
-from django.test import TestCase
+
+from django.forms import formset_factory
 
 from cashier.forms import (
     DaftarBarangForm, DaftarTransaksiForm,
@@ -135,159 +136,211 @@ class TestDaftarBarangForm:
 # TransaksiProductListForm Tests (Complex Business Logic)
 # ============================================================
 
+@pytest.fixture(scope='class')
+def form_profile(django_db_setup, django_db_blocker):
+    """
+    Profile yang committed sekali per class: enam test transaksi di
+    bawah memakai user yang sama, tidak perlu 6x User+Profile INSERT
+    """
+    with django_db_blocker.unblock():
+        profile = ProfileFactory(user__username='form_tests_user')
+    return profile
+
+
+@pytest.fixture
+def stock_product(form_profile, db):
+    """Produk standar 100 unit @5000 (per test: stock-nya dimutasi)"""
+    return DaftarBarangFactory(
+        user=form_profile,
+        jumlah_produk=100,
+        harga_jual_satuan=Decimal('5000.00'),
+    )
+
+
+@pytest.fixture
+def transaksi(form_profile, db):
+    """DaftarTransaksi kosong milik user yang sama dengan produknya"""
+    return DaftarTransaksiFactory(user=form_profile)
+
+
 @pytest.mark.django_db
 @pytest.mark.unit
 class TestTransaksiProductListForm:
     """Test TransaksiProductListForm - Critical business logic"""
-    
-    def test_form_valid_data(self):
+
+    def test_form_valid_data(self, stock_product):
         """Test form dengan data valid"""
-        product = DaftarBarangFactory(jumlah_produk=100)
-        
         form_data = {
-            'nama_barang': product.nomor,
+            'nama_barang': stock_product.nomor,
             'quantity': 10,
-            'user': product.user.id,
+            'user': stock_product.user.id,
         }
-        
+
         form = TransaksiProductListForm(data=form_data)
         assert form.is_valid()
-    
-    def test_transaction_reduces_stock(self):
+
+    def test_transaction_reduces_stock(self, stock_product, transaksi):
         """Test transaksi mengurangi stock"""
-        product = DaftarBarangFactory(
-            nama_product="Test Product",
-            jumlah_produk=100,
-            harga_jual_satuan=Decimal('5000.00')
-        )
-        
-        transaksi = DaftarTransaksiFactory(user=product.user)
-        
         form_data = {
-            'nama_barang': product.nomor,
+            'nama_barang': stock_product.nomor,
             'quantity': 10,
-            'user': product.user.id,
+            'user': stock_product.user.id,
         }
-        
+
         form = TransaksiProductListForm(data=form_data)
         assert form.is_valid()
-        
+
         result = form.save(transaksi)
-        
+
         # Check stock reduced
-        product.refresh_from_database()
-        assert product.jumlah_produk == 90
-        
+        stock_product.refresh_from_db(fields=['jumlah_produk'])
+        assert stock_product.jumlah_produk == 90
+
         # Check product added to transaction
         assert result is not False
         assert result.quantity == 10
-    
-    def test_transaction_fails_insufficient_stock(self):
+
+    def test_transaction_fails_insufficient_stock(self, form_profile, transaksi):
         """Test transaksi gagal jika stock tidak cukup"""
         product = DaftarBarangFactory(
+            user=form_profile,
             nama_product="Limited Product",
             jumlah_produk=5,  # Only 5 in stock
             harga_jual_satuan=Decimal('5000.00')
         )
-        
-        transaksi = DaftarTransaksiFactory(user=product.user)
-        
+
         form_data = {
             'nama_barang': product.nomor,
             'quantity': 10,  # Trying to buy 10
             'user': product.user.id,
         }
-        
+
         form = TransaksiProductListForm(data=form_data)
         assert form.is_valid()
-        
+
         result = form.save(transaksi)
-        
+
         # Transaction should fail
         assert result is False
-        
+
         # Stock should not change
-        product.refresh_from_database()
+        product.refresh_from_db(fields=['jumlah_produk'])
         assert product.jumlah_produk == 5
-    
-    def test_transaction_deletes_product_when_stock_zero(self):
+
+    def test_transaction_deletes_product_when_stock_zero(self, form_profile, transaksi):
         """Test produk dihapus saat stock habis"""
         product = DaftarBarangFactory(
+            user=form_profile,
             nama_product="Last Stock",
             jumlah_produk=10,
             harga_jual_satuan=Decimal('5000.00')
         )
         product_id = product.nomor
-        
-        transaksi = DaftarTransaksiFactory(user=product.user)
-        
+
         form_data = {
             'nama_barang': product.nomor,
             'quantity': 10,  # Buy all
             'user': product.user.id,
         }
-        
+
         form = TransaksiProductListForm(data=form_data)
         assert form.is_valid()
-        
+
         result = form.save(transaksi)
-        
+
         # Product should be deleted
         assert not DaftarBarang.objects.filter(nomor=product_id).exists()
-        
+
         # Transaction should still succeed
         assert result is not False
-    
-    def test_transaction_calculates_subtotal(self):
+
+    def test_transaction_calculates_subtotal(self, stock_product, transaksi):
         """Test perhitungan subtotal transaksi"""
-        product = DaftarBarangFactory(
-            jumlah_produk=100,
-            harga_jual_satuan=Decimal('5000.00')
-        )
-        
-        transaksi = DaftarTransaksiFactory(user=product.user)
-        
         form_data = {
-            'nama_barang': product.nomor,
+            'nama_barang': stock_product.nomor,
             'quantity': 5,
-            'user': product.user.id,
+            'user': stock_product.user.id,
         }
-        
+
         form = TransaksiProductListForm(data=form_data)
         result = form.save(transaksi)
-        
+
         # Check subtotal calculation
         expected_subtotal = Decimal('5000.00') * 5
         assert result.subtotal == expected_subtotal
-    
-    def test_transaction_updates_product_prices(self):
+
+    def test_transaction_updates_product_prices(self, form_profile, transaksi):
         """Test harga produk diupdate setelah transaksi"""
         product = DaftarBarangFactory(
+            user=form_profile,
             jumlah_produk=100,
             harga_beli_satuan=Decimal('3000.00'),
             laba_persen=20
         )
-        
+
         original_subtotal_beli = product.subtotal_harga_beli
         original_subtotal_jual = product.subtotal_harga_jual
-        
-        transaksi = DaftarTransaksiFactory(user=product.user)
-        
+
         form_data = {
             'nama_barang': product.nomor,
             'quantity': 10,
             'user': product.user.id,
         }
-        
+
         form = TransaksiProductListForm(data=form_data)
         form.save(transaksi)
-        
-        product.refresh_from_database()
-        
+
+        product.refresh_from_db(fields=['subtotal_harga_beli', 'subtotal_harga_jual'])
+
         # Subtotals should be recalculated based on new stock
         assert product.subtotal_harga_beli < original_subtotal_beli
         assert product.subtotal_harga_jual < original_subtotal_jual
 
+    def test_formset_multiple_products(self, form_profile, transaksi):
+        """Test formset multi-produk disimpan langsung tanpa view/middleware"""
+        DaftarBarang.objects.bulk_create([
+            DaftarBarangFactory.build(
+                user=form_profile,
+                jumlah_produk=100,
+                harga_jual_satuan=Decimal('5000.00')
+            ),
+            DaftarBarangFactory.build(
+                user=form_profile,
+                jumlah_produk=50,
+                harga_jual_satuan=Decimal('3000.00')
+            ),
+        ])
+        # sqlite di Django 2.2 tidak mengembalikan pk dari bulk_create
+        product2, product1 = DaftarBarang.objects.filter(
+            user=form_profile
+        ).order_by('-nomor')[:2]
+
+        TransaksiListProdukFormset = formset_factory(TransaksiProductListForm, extra=1)
+        formset = TransaksiListProdukFormset(data={
+            'form-TOTAL_FORMS': '2',
+            'form-INITIAL_FORMS': '0',
+            'form-0-nama_barang': product1.nomor,
+            'form-0-quantity': '5',
+            'form-0-user': form_profile.id,
+            'form-1-nama_barang': product2.nomor,
+            'form-1-quantity': '10',
+            'form-1-user': form_profile.id,
+        })
+        assert formset.is_valid()
+
+        results = [form.save(transaksi) for form in formset]
+        assert all(result is not False for result in results)
+
+        # Subtotal kedua produk
+        expected_total = (5 * Decimal('5000.00')) + (10 * Decimal('3000.00'))
+        assert sum(result.subtotal for result in results) == expected_total
+
+        # Stock kedua produk berkurang
+        product1.refresh_from_db(fields=['jumlah_produk'])
+        product2.refresh_from_db(fields=['jumlah_produk'])
+        assert product1.jumlah_produk == 95
+        assert product2.jumlah_produk == 40
+
 
 # ============================================================
 # DaftarTransaksiForm Tests
@@ -370,16 +423,16 @@ class TestFormEdgeCases:
         }
         
         form = TransaksiProductListForm(data=form_data)
-        # Form might still be valid, but save() should handle it
-        if form.is_valid():
-            result = form.save(transaksi)
-            # Depends on implementation
+        # Form lolos validasi field, tapi save() harus menolak
+        assert form.is_valid()
+        assert form.save(transaksi) is False
     
     def test_form_with_zero_quantity(self):
         """Test form dengan quantity 0"""
         product = DaftarBarangFactory()
         transaksi = DaftarTransaksiFactory(user=product.user)
-        
+        initial_stock = product.jumlah_produk
+
         form_data = {
             'nama_barang': product.nomor,
             'quantity': 0,
@@ -387,7 +440,12 @@ class TestFormEdgeCases:
         }
         
         form = TransaksiProductListForm(data=form_data)
-        # Should ideally fail or be handled gracefully
+        # Save ditolak dan stock tidak berubah
+        assert form.is_valid()
+        assert form.save(transaksi) is False
+
+        product.refresh_from_db(fields=['jumlah_produk'])
+        assert product.jumlah_produk == initial_stock
     
     def test_concurrent_transactions_same_product(self):
         """Test 2 transaksi simultan pada produk yang sama"""
@@ -16,6 +16,15 @@ from tests.factories import (
     StockFactory, IndomieProductFactory
 )
 
+# Konstanta Decimal yang dipakai berulang di test harga: parsing string
+# Decimal cukup sekali di import time
+FIVE_K = Decimal('5000.00')
+TEN_K = Decimal('10000.00')
+FIFTY_K = Decimal('50000.00')
+TWENTY_PCT = Decimal('0.20')
+LABA_20 = Decimal('1.20')
+
+
 # ============================================================
 # Profile Model Tests
 # ============================================================
@@ -40,7 +49,7 @@ class TestProfileModel:
         profile = ProfileFactory(user__username='testuser')
         assert str(profile) == 'testuser Profile'
     
-    def test_profile_auto_created_with_user(self):
+    def test_profile_auto_created_with_user(self, profile_signals):
         """Test profile otomatis dibuat saat user dibuat (via signal)"""
         user = User.objects.create_user(
             username='newuser',
@@ -56,7 +65,7 @@ class TestProfileModel:
         profile.nama_depan = new_name
         profile.save()
         
-        profile.refresh_from_database()
+        profile.refresh_from_db(fields=['nama_depan'])
         assert profile.nama_depan == new_name
 
 
@@ -124,32 +133,32 @@ class TestDaftarBarangModel:
         """Test perhitungan subtotal harga beli"""
         barang = DaftarBarangFactory(
             jumlah_produk=10,
-            harga_beli_satuan=Decimal('5000.00')
+            harga_beli_satuan=FIVE_K
         )
-        
-        expected = Decimal('10') * Decimal('5000.00')
+
+        expected = 10 * FIVE_K
         assert barang.subtotal_harga_beli == expected
     
     def test_calculate_harga_jual_with_profit(self):
         """Test perhitungan harga jual dengan laba"""
         barang = DaftarBarangFactory(
-            harga_beli_satuan=Decimal('5000.00'),
+            harga_beli_satuan=FIVE_K,
             laba_persen=20
         )
-        
-        expected = Decimal('5000.00') * Decimal('1.20')
+
+        expected = FIVE_K * LABA_20
         assert barang.harga_jual_satuan == expected
     
     def test_calculate_subtotal_harga_jual(self):
         """Test perhitungan subtotal harga jual"""
         barang = DaftarBarangFactory(
             jumlah_produk=10,
-            harga_beli_satuan=Decimal('5000.00'),
+            harga_beli_satuan=FIVE_K,
             laba_persen=20
         )
-        
-        subtotal_beli = Decimal('50000.00')
-        laba = subtotal_beli * Decimal('0.20')
+
+        subtotal_beli = FIFTY_K
+        laba = subtotal_beli * TWENTY_PCT
         expected = subtotal_beli + laba
         
         assert barang.subtotal_harga_jual == expected
@@ -157,20 +166,20 @@ class TestDaftarBarangModel:
     def test_barang_with_zero_profit(self):
         """Test barang dengan laba 0%"""
         barang = DaftarBarangFactory(
-            harga_beli_satuan=Decimal('5000.00'),
+            harga_beli_satuan=FIVE_K,
             laba_persen=0
         )
-        
-        assert barang.harga_jual_satuan == Decimal('5000.00')
+
+        assert barang.harga_jual_satuan == FIVE_K
     
     def test_barang_with_high_profit(self):
         """Test barang dengan laba tinggi"""
         barang = DaftarBarangFactory(
-            harga_beli_satuan=Decimal('5000.00'),
+            harga_beli_satuan=FIVE_K,
             laba_persen=100
         )
-        
-        assert barang.harga_jual_satuan == Decimal('10000.00')
+
+        assert barang.harga_jual_satuan == TEN_K
     
     def test_indomie_preset(self):
         """Test preset Indomie"""
@@ -247,7 +256,7 @@ class TestListProductTransaksiModel:
         product2 = ListProductTransaksiFactory(transaksi_id=transaksi)
         
         products = ListProductTransaksi.objects.filter(transaksi_id=transaksi)
-        assert products.count() == 2
+        assert len(products) == 2
     
     def test_calculate_subtotal(self):
         """Test perhitungan subtotal product"""
@@ -265,40 +274,59 @@ class TestListProductTransaksiModel:
 # Integration Tests - Model Relationships
 # ============================================================
 
+@pytest.fixture(scope='class')
+def related_graph(django_db_setup, django_db_blocker):
+    """
+    Object graph (user-profile-barang-transaksi-product) dibuat sekali
+    per class di dalam transaksi yang di-rollback saat teardown; test
+    relasi hanya membaca, tidak perlu graph baru per test.
+    test_cascade_delete_transaksi sengaja membangun graph sendiri
+    karena delete-nya destruktif terhadap graph bersama.
+    """
+    from django.db import transaction
+
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        user = UserFactory()
+        profile = ProfileFactory(user=user)
+        graph = {
+            'user': user,
+            'profile': profile,
+            'barang': DaftarBarangFactory(user=profile),
+            'transaksi': DaftarTransaksiFactory(user=profile),
+        }
+        graph['product'] = ListProductTransaksiFactory(
+            transaksi_id=graph['transaksi']
+        )
+    yield graph
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
 @pytest.mark.django_db
 @pytest.mark.unit
 class TestModelRelationships:
     """Test hubungan antar models"""
-    
-    def test_profile_to_user_relationship(self):
+
+    def test_profile_to_user_relationship(self, related_graph):
         """Test relasi Profile -> User"""
-        user = UserFactory()
-        profile = ProfileFactory(user=user)
-        
-        assert profile.user == user
-        assert user.profile == profile
-    
-    def test_daftar_barang_to_profile_relationship(self):
+        assert related_graph['profile'].user == related_graph['user']
+        assert related_graph['user'].profile == related_graph['profile']
+
+    def test_daftar_barang_to_profile_relationship(self, related_graph):
         """Test relasi DaftarBarang -> Profile"""
-        profile = ProfileFactory()
-        barang = DaftarBarangFactory(user=profile)
-        
-        assert barang.user == profile
-    
-    def test_transaksi_to_profile_relationship(self):
+        assert related_graph['barang'].user == related_graph['profile']
+
+    def test_transaksi_to_profile_relationship(self, related_graph):
         """Test relasi DaftarTransaksi -> Profile"""
-        profile = ProfileFactory()
-        transaksi = DaftarTransaksiFactory(user=profile)
-        
-        assert transaksi.user == profile
-    
-    def test_list_product_to_transaksi_relationship(self):
+        assert related_graph['transaksi'].user == related_graph['profile']
+
+    def test_list_product_to_transaksi_relationship(self, related_graph):
         """Test relasi ListProductTransaksi -> DaftarTransaksi"""
-        transaksi = DaftarTransaksiFactory()
-        product = ListProductTransaksiFactory(transaksi_id=transaksi)
-        
-        assert product.transaksi_id == transaksi
-    
+        assert related_graph['product'].transaksi_id == related_graph['transaksi']
+
     def test_cascade_delete_transaksi(self):
         """Test cascade delete saat transaksi dihapus"""
         transaksi = DaftarTransaksiFactory()